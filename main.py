@@ -13,6 +13,8 @@ from server.services import brokerConnector as broker
 from server.services import riskManager as risk
 from server.services import tradeLogger as logger
 from server.services import news_filter as news
+from server.services import stateBridge as bridge
+from server.services import positionManager as manager
 
 # --- Configuration (can be overridden via .env) ---
 SCAN_INTERVAL = float(os.getenv("SCAN_INTERVAL", "10.0"))             # seconds between scan cycles
@@ -44,9 +46,46 @@ def get_open_positions_count():
     except Exception:
         return 0
 
-def max_daily_loss_reached(balance):
+def fetch_positions():
+    """Return open MT5 positions (empty tuple if not available)."""
+    try:
+        return broker.mt5.positions_get() or ()
+    except Exception:
+        return ()
+
+def snapshot_positions(positions):
+    """Return positions keyed by ticket for the state bridge."""
+    return {
+        str(p.ticket): {
+            "symbol": p.symbol,
+            "type": "buy" if p.type == broker.mt5.POSITION_TYPE_BUY else "sell",
+            "volume": float(p.volume),
+            "price_open": float(p.price_open),
+            "sl": float(p.sl),
+            "tp": float(p.tp),
+            "profit": float(p.profit),
+        }
+        for p in positions
+    }
+
+def publish_state(status, balance, positions, symbols, daily_stats, timing):
+    """
+    Push the current bot state to the dashboard bridge (non-blocking).
+    Takes data already fetched this cycle; makes no MT5 or file I/O of its own.
+    """
+    bridge.publish({
+        "status": status,
+        "balance": float(balance),
+        "positions": snapshot_positions(positions),
+        "symbols": symbols,
+        "daily": daily_stats,
+        "timing": timing,
+    })
+
+def max_daily_loss_reached(balance, stats=None):
     """Return True if daily PnL < -MAX_DAILY_LOSS_PCT * balance."""
-    stats = logger.reset_daily_stats_if_needed()
+    if stats is None:
+        stats = logger.reset_daily_stats_if_needed()
     daily_pnl = stats.get("daily_pnl", 0.0)
     if daily_pnl < - (MAX_DAILY_LOSS_PCT * balance):
         return True
@@ -74,19 +113,37 @@ def compute_indicators(candles):
 def main_loop():
     LOG.info("Starting bot main loop.")
     broker.connect_mt5()  # will raise if not connected
+    bridge.start_bridge()
+    symbols_state = {}  # per-symbol indicators/last signal published to the dashboard
+    cycle = 0
+    paused_until = 0.0  # entries blocked until this time after the daily loss limit trips
     try:
         while True:
+            cycle += 1
+            cycle_start = time.perf_counter()
             balance = broker.get_account_balance()
             LOG.info("Balance: %.2f", balance)
 
-            # Safety: stop trading for the day if daily loss limit hit
-            if max_daily_loss_reached(balance):
-                LOG.warning("Daily loss limit reached (%.2f%%). Pausing until next day.", MAX_DAILY_LOSS_PCT*100)
-                time.sleep(60*60)  # pause 1 hour; will be skipped if still over limit
-                continue
+            # Refresh/reset daily stats and fetch open positions once per cycle
+            daily_stats = logger.reset_daily_stats_if_needed()
+            open_positions = fetch_positions()
 
-            # Refresh/reset daily stats
-            logger.reset_daily_stats_if_needed()
+            # Trail / break-even open positions every cycle (one batched pass, also while paused)
+            manage_start = time.perf_counter()
+            manager.manage_positions({s: v["atr"] for s, v in symbols_state.items()}, open_positions)
+            timing = {"cycle": cycle, "scan_interval": SCAN_INTERVAL,
+                      "manage_ms": round((time.perf_counter() - manage_start) * 1000.0, 1)}
+
+            # Safety: block new entries for 1 hour if daily loss limit hit (re-checked afterwards).
+            # Keep cycling every SCAN_INTERVAL so open positions are still trailed meanwhile.
+            if time.time() >= paused_until and max_daily_loss_reached(balance, daily_stats):
+                LOG.warning("Daily loss limit reached (%.2f%%). Pausing entries for 1 hour.", MAX_DAILY_LOSS_PCT*100)
+                paused_until = time.time() + 60*60
+            if time.time() < paused_until:
+                timing["cycle_ms"] = round((time.perf_counter() - cycle_start) * 1000.0, 1)
+                publish_state("paused_daily_loss", balance, open_positions, symbols_state, daily_stats, timing)
+                time.sleep(SCAN_INTERVAL)
+                continue
 
             for symbol in ALL_PAIRS:
                 # Symbol gating (gold locked until balance threshold)
@@ -136,12 +193,22 @@ def main_loop():
                     elif indicators["rsi"] > 70:
                         signal = "sell"
 
+                symbols_state[symbol] = {
+                    "ema9": float(indicators["ema9"]),
+                    "ema21": float(indicators["ema21"]),
+                    "rsi": float(indicators["rsi"]),
+                    "atr": float(indicators["atr"]),
+                    "adx": float(indicators["adx"]),
+                    "spread": float(spread),
+                    "signal": signal or "none",
+                }
+
                 if not signal:
                     continue
 
                 # Stop loss and take profit using ATR (rounded to integer pips)
                 sl_pips = max(5, int(round(indicators["atr"] * 1.5)))
-                tp_pips = int(round(sl_pips * 1.5))
+                tp_pips = int(round(sl_pips * manager.TP_R_MULTIPLE))
 
                 # Determine risk mode (fixed-dollar for tiny accounts, percent for larger)
                 risk_value, risk_pct = risk.auto_risk_mode(balance)
@@ -179,9 +246,12 @@ def main_loop():
                 # tiny per-symbol pause (reduce to increase frequency cautiously)
                 time.sleep(0.5)
 
-            # end symbol loop -> wait before next cycle
+            # end symbol loop -> publish state, then wait before next cycle
+            timing["cycle_ms"] = round((time.perf_counter() - cycle_start) * 1000.0, 1)
+            publish_state("running", balance, open_positions, symbols_state, daily_stats, timing)
             time.sleep(SCAN_INTERVAL)
     finally:
+        bridge.stop_bridge()
         broker.disconnect_mt5()
 
 if __name__ == "__main__":
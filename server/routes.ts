@@ -6,6 +6,7 @@ import { tradingEngine } from "./services/tradingEngine";
 import { brokerConnector } from "./services/brokerConnector";
 import { riskManager } from "./services/riskManager";
 import { economicCalendar } from "./services/economicCalendar";
+import { botStateBridge, type BotState } from "./services/stateBridge";
 
 export async function registerRoutes(app: Express): Promise<Server> {
   // Trading account routes
@@ -184,6 +185,16 @@ export async function registerRoutes(app: Express): Promise<Server> {
     }
   });
 
+  // Live state published by the Python bot
+  app.get("/api/bot/state", async (req, res) => {
+    try {
+      res.json(botStateBridge.getState());
+    } catch (error) {
+      console.error("Error fetching bot state:", error);
+      res.status(500).json({ message: "Failed to fetch bot state" });
+    }
+  });
+
   // Market data routes
   app.get("/api/market-data/:symbol", async (req, res) => {
     try {
@@ -197,6 +208,9 @@ export async function registerRoutes(app: Express): Promise<Server> {
 
   const httpServer = createServer(app);
 
+  botStateBridge.setMaxListeners(0);
+  botStateBridge.start();
+
   // WebSocket server for real-time updates
   const wss = new WebSocketServer({ server: httpServer, path: '/ws' });
 
@@ -227,9 +241,18 @@ export async function registerRoutes(app: Express): Promise<Server> {
       }
     }, 5000);
 
+    // Forward live bot state as the Python runtime publishes it
+    const onBotState = (state: BotState) => {
+      if (ws.readyState === WebSocket.OPEN) {
+        ws.send(JSON.stringify({ type: 'bot_state', data: state }));
+      }
+    };
+    botStateBridge.on('update', onBotState);
+
     ws.on('close', () => {
       console.log('WebSocket client disconnected');
       clearInterval(updateInterval);
+      botStateBridge.off('update', onBotState);
     });
 
     ws.on('message', (message) => {
@@ -103,3 +103,27 @@ def place_order_mt5(symbol, direction, lots, sl_pips, tp_pips, deviation=20, mag
         return {"ok": False, "error": "order failed", "result": result_dict}
     LOG.info("Order placed: %s", result_dict)
     return {"ok": True, "result": result_dict}
+
+def modify_position_sltp(ticket, symbol, sl, tp, digits, magic=123456):
+    """
+    Move SL/TP of an open position (TRADE_ACTION_SLTP).
+    Returns dict with 'ok' bool and details, like place_order_mt5.
+    """
+    request = {
+        "action": mt5.TRADE_ACTION_SLTP,
+        "position": int(ticket),
+        "symbol": symbol,
+        "sl": float("{:.{}f}".format(sl, digits)),
+        "tp": float("{:.{}f}".format(tp, digits)),
+        "magic": magic,
+    }
+
+    result = mt5.order_send(request)
+    if result is None:
+        LOG.error("SLTP order_send returned None: %s", mt5.last_error())
+        return {"ok": False, "error": "order_send returned None", "last_error": mt5.last_error()}
+    result_dict = result._asdict()
+    if result_dict.get("retcode") != mt5.TRADE_RETCODE_DONE:
+        LOG.error("SLTP modify failed for %s: %s", ticket, result_dict)
+        return {"ok": False, "error": "modify failed", "result": result_dict}
+    return {"ok": True, "result": result_dict}
@@ -0,0 +1,114 @@
+# server/services/positionManager.py
+import os
+import logging
+import numpy as np
+from dotenv import load_dotenv
+
+from server.services import brokerConnector as broker
+
+load_dotenv()
+LOG = logging.getLogger("positionManager")
+LOG.setLevel(logging.INFO)
+
+# === ENV CONFIG ===
+# Distances are multiples of the symbol ATR (price units). Positions without a
+# known ATR fall back to their initial stop distance (1R), recovered from the
+# untouched TP; positions with neither are left alone.
+BREAKEVEN_ATR = float(os.getenv("BREAKEVEN_ATR", "1.0"))                   # profit that moves SL to entry
+BREAKEVEN_OFFSET_POINTS = float(os.getenv("BREAKEVEN_OFFSET_POINTS", "10"))  # lock in a little past entry
+TRAIL_START_ATR = float(os.getenv("TRAIL_START_ATR", "1.5"))               # profit that starts the trail
+TRAIL_DISTANCE_ATR = float(os.getenv("TRAIL_DISTANCE_ATR", "1.0"))         # trail distance behind price
+SLTP_MIN_STEP_POINTS = float(os.getenv("SLTP_MIN_STEP_POINTS", "20"))      # ignore moves smaller than this
+BOT_MAGIC = int(os.getenv("BOT_MAGIC", "123456"))                          # only manage our own positions
+TP_R_MULTIPLE = float(os.getenv("TP_R_MULTIPLE", "1.5"))                   # TP distance / SL distance at entry
+
+
+def compute_stop_levels(is_buy, price_open, sl, tp, bid, ask, atr, point, stops_level):
+    """
+    Vectorized trailing-stop / break-even pass over a set of positions.
+    All arguments are equal-length arrays (sl/tp == 0 means not set).
+    Returns (new_sl, changed): proposed stops and a mask of positions whose stop
+    tightened by more than SLTP_MIN_STEP_POINTS. Stops are never loosened and
+    never placed closer to price than stops_level points.
+    """
+    direction = np.where(is_buy, 1.0, -1.0)
+    current = np.where(is_buy, bid, ask)  # price the position would close at
+    profit = (current - price_open) * direction
+    has_sl = sl > 0
+
+    # sl moves once managed, tp does not: initial risk = tp distance / TP_R_MULTIPLE
+    initial_risk = np.where(tp > 0, np.abs(tp - price_open) / TP_R_MULTIPLE, np.nan)
+    with np.errstate(invalid="ignore"):
+        unit = np.where(atr > 0, atr, initial_risk)
+        be_hit = profit >= BREAKEVEN_ATR * unit
+        trail_hit = profit >= TRAIL_START_ATR * unit
+
+    # work in "distance in favour of the position" so tighter is always larger
+    be_level = (price_open + direction * BREAKEVEN_OFFSET_POINTS * point) * direction
+    trail_level = (current - direction * TRAIL_DISTANCE_ATR * unit) * direction
+    candidate = np.maximum(np.where(be_hit, be_level, -np.inf),
+                           np.where(trail_hit, trail_level, -np.inf))
+    # broker rejects stops inside trade_stops_level of the current price: clamp to that boundary
+    boundary = current * direction - np.maximum(stops_level, 0) * point
+    candidate = np.minimum(np.round(candidate / point) * point, boundary)
+    existing = np.where(has_sl, sl * direction, -np.inf)
+    tighter = np.isfinite(candidate) & (candidate > existing + 0.5 * point)
+
+    new_sl = np.where(tighter, candidate * direction, sl)
+    moved = np.abs(new_sl - sl) > SLTP_MIN_STEP_POINTS * point
+    return new_sl, tighter & moved
+
+
+def manage_positions(atr_by_symbol=None, positions=None, magic=BOT_MAGIC):
+    """
+    Trail / break-even all open bot positions in one pass.
+    - atr_by_symbol: {symbol: atr in price units}, e.g. from the last indicator scan
+    - positions: result of this cycle's positions_get (fetched here if None)
+    One positions_get call per cycle, one tick + symbol_info per distinct symbol,
+    and a TRADE_ACTION_SLTP request only for positions whose stop changed.
+    Returns the list of modified position tickets.
+    """
+    if broker.mt5 is None:
+        return []
+    mt5 = broker.mt5
+    atr_by_symbol = atr_by_symbol or {}
+
+    if positions is None:
+        try:
+            positions = mt5.positions_get()
+        except Exception as e:
+            LOG.warning("positions_get failed: %s", e)
+            return []
+    if not positions:
+        return []
+    positions = [p for p in positions if p.magic == magic]
+
+    # per-symbol market data, fetched once regardless of how many layers are open
+    market, digits = {}, {}
+    for symbol in {p.symbol for p in positions}:
+        tick = broker.get_tick(symbol)
+        info = mt5.symbol_info(symbol)
+        if tick and info:
+            market[symbol] = (tick.bid, tick.ask, info.point, info.trade_stops_level,
+                              float(atr_by_symbol.get(symbol) or 0.0))
+            digits[symbol] = info.digits
+    positions = [p for p in positions if p.symbol in market]
+    if not positions:
+        return []
+
+    rows = np.array([(p.type == mt5.POSITION_TYPE_BUY, p.price_open, p.sl, p.tp, *market[p.symbol])
+                     for p in positions], dtype=float)
+    is_buy, price_open, sl, tp, bid, ask, point, stops_level, atr = rows.T
+    new_sl, changed = compute_stop_levels(is_buy.astype(bool), price_open, sl, tp, bid, ask, atr,
+                                          point, stops_level)
+
+    modified = []
+    for i in np.flatnonzero(changed):
+        p = positions[i]
+        res = broker.modify_position_sltp(p.ticket, p.symbol, new_sl[i], p.tp, digits[p.symbol], magic=magic)
+        if res.get("ok"):
+            modified.append(p.ticket)
+            LOG.info("Moved SL on %s #%s: %s -> %s", p.symbol, p.ticket, p.sl, new_sl[i])
+        else:
+            LOG.warning("Failed to move SL on %s #%s: %s", p.symbol, p.ticket, res.get("error"))
+    return modified
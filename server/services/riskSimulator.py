@@ -0,0 +1,239 @@
+# server/services/riskSimulator.py
+"""
+Monte Carlo risk-of-ruin simulator for the bot's sizing and layering rules.
+
+Runs many equity paths at once (NumPy, one array pass per signal) using the
+riskManager sizing rules, MAX_LAYERS stacking and the MAX_DAILY_LOSS_PCT stop
+from main.py. Usage:
+
+    python -m server.services.riskSimulator --win-rate 0.48 --r-multiple 1.5 --correlation 0.6
+"""
+import os
+import math
+import time
+import logging
+import argparse
+from statistics import NormalDist
+
+import numpy as np
+from dotenv import load_dotenv
+
+from server.services import riskManager as risk
+
+load_dotenv()
+LOG = logging.getLogger("riskSimulator")
+
+# Same env knobs (and defaults) as main.py
+MAX_DAILY_LOSS_PCT = float(os.getenv("MAX_DAILY_LOSS_PCT", "0.20"))
+MAX_OPEN_TRADES = int(os.getenv("MAX_OPEN_TRADES", "5"))
+MAX_LAYERS = int(os.getenv("MAX_LAYERS", "3"))
+MIN_BALANCE_FOR_GOLD = float(os.getenv("MIN_BALANCE_FOR_GOLD", "500.0"))
+
+BATCH_SIZE = 50000  # paths per batch; bounds memory at ~signals_per_day * BATCH_SIZE per day
+
+
+def lots_for_balance(balance, stop_loss_pips, pip_value):
+    """
+    Vectorized riskManager.auto_risk_mode + calculate_lot:
+    fixed-dollar risk below SMALL_ACCOUNT_THRESHOLD, DEFAULT_RISK_PCT above,
+    rounded to 0.01 and clamped to [MIN_LOT, MAX_LOT].
+    """
+    risk_amount = np.where(
+        balance < risk.SMALL_ACCOUNT_THRESHOLD,
+        np.maximum(risk.SMALL_ACCOUNT_MIN_RISK, balance * risk.SMALL_ACCOUNT_RISK_PCT),
+        balance * risk.DEFAULT_RISK_PCT,
+    )
+    lots = np.round(risk_amount / (stop_loss_pips * pip_value), 2)
+    return np.clip(lots, risk.MIN_LOT, risk.MAX_LOT)
+
+
+def check_sizing_parity(stop_loss_pips, symbol, balances=None):
+    """Raise if lots_for_balance disagrees with riskManager.calculate_lot on a balance grid."""
+    if balances is None:
+        balances = np.concatenate([np.linspace(1.0, 2 * risk.SMALL_ACCOUNT_THRESHOLD, 40),
+                                   np.geomspace(2 * risk.SMALL_ACCOUNT_THRESHOLD, 1e6, 40)])
+    pip_value = risk.pip_value_per_lot(symbol)
+    vectorized = lots_for_balance(balances, stop_loss_pips, pip_value)
+    level = risk.LOG.level
+    risk.LOG.setLevel(logging.WARNING)  # calculate_lot logs every call
+    try:
+        scalar = np.array([risk.calculate_lot(float(b), stop_loss_pips, symbol) for b in balances])
+    finally:
+        risk.LOG.setLevel(level)
+    mismatch = ~np.isclose(vectorized, scalar)
+    if mismatch.any():
+        b = balances[mismatch][0]
+        raise RuntimeError(f"Sizing drift at balance {b:.2f}: simulator={vectorized[mismatch][0]} "
+                           f"riskManager={scalar[mismatch][0]}; update lots_for_balance")
+
+
+def layer_win_distribution(win_rate, correlation, layers, nodes=64):
+    """
+    P(k of `layers` entries win) for k = 0..layers when layer outcomes are tied
+    together by a one-factor Gaussian copula with the given correlation.
+    Integrates the binomial over the common factor with Gauss-Hermite quadrature,
+    so the simulator can draw one uniform per signal instead of one normal per layer.
+    """
+    if correlation >= 1.0:
+        probs = np.zeros(layers + 1)
+        probs[0], probs[layers] = 1.0 - win_rate, win_rate
+        return probs
+    threshold = NormalDist().inv_cdf(win_rate)
+    x, w = np.polynomial.hermite_e.hermegauss(nodes)
+    w = w / w.sum()
+    cdf = NormalDist().cdf
+    p = np.array([cdf((threshold - math.sqrt(correlation) * xi) / math.sqrt(1.0 - correlation)) for xi in x])
+    k = np.arange(layers + 1)
+    comb = np.array([math.comb(layers, i) for i in k], dtype=float)
+    probs = (w[:, None] * comb * p[:, None] ** k * (1.0 - p[:, None]) ** (layers - k)).sum(axis=0)
+    return probs / probs.sum()
+
+
+def _simulate_batch(rng, n_paths, start_balance, win_cdf, r_multiple, layers, signals_per_day,
+                    days, stop_loss_pips, pip_value, cost_pips, ruin_balance, target_balance,
+                    daily_loss_pct):
+    balance = np.full(n_paths, float(start_balance))
+    peak = balance.copy()
+    max_dd = np.zeros(n_paths)
+    ruined = np.zeros(n_paths, dtype=bool)
+    day_reached = np.full(n_paths, np.nan)
+    day_reached[balance >= target_balance] = 0
+    stopped_days = np.zeros(n_paths)
+
+    win_pnl_per_lot = (r_multiple * stop_loss_pips - cost_pips) * pip_value
+    loss_pnl_per_lot = -(stop_loss_pips + cost_pips) * pip_value
+    # pnl per lot for 0..layers winning layers of one signal
+    signal_pnl_per_lot = np.arange(layers + 1) * win_pnl_per_lot + (layers - np.arange(layers + 1)) * loss_pnl_per_lot
+
+    for day in range(1, days + 1):
+        day_start = balance.copy()
+        halted = np.zeros(n_paths, dtype=bool)
+        wins = np.searchsorted(win_cdf, rng.random((signals_per_day, n_paths)), side="right")
+        for step in range(signals_per_day):
+            active = ~(ruined | halted)
+            if not active.any():
+                break
+            pnl = lots_for_balance(balance, stop_loss_pips, pip_value) * signal_pnl_per_lot[wins[step]]
+            balance = np.where(active, np.maximum(balance + pnl, 0.0), balance)
+
+            np.maximum(peak, balance, out=peak)
+            np.maximum(max_dd, 1.0 - balance / peak, out=max_dd)
+            ruined |= balance < ruin_balance
+            day_reached[np.isnan(day_reached) & (balance >= target_balance) & ~ruined] = day
+            # main.py: daily_pnl < -MAX_DAILY_LOSS_PCT * balance pauses entries for the day
+            halted |= (balance - day_start) < -daily_loss_pct * balance
+        stopped_days += halted & ~ruined
+
+    return balance, max_dd, ruined, day_reached, stopped_days
+
+
+def simulate(win_rate, r_multiple=1.5, correlation=0.5, start_balance=20.0, n_paths=100000,
+             days=60, signals_per_day=10, stop_loss_pips=10, symbol="EURUSD", layers=None,
+             cost_pips=0.0, ruin_balance=None, target_balance=MIN_BALANCE_FOR_GOLD,
+             daily_loss_pct=MAX_DAILY_LOSS_PCT, seed=None):
+    """
+    Simulate n_paths equity curves and return a summary dict.
+    - win_rate: probability a single layer hits TP before SL
+    - r_multiple: TP distance / SL distance (main.py uses 1.5)
+    - correlation: outcome correlation between layers of the same signal (0..1)
+    - layers: entries per signal (default min(MAX_LAYERS, MAX_OPEN_TRADES))
+    - ruin_balance: default is the loss of one MIN_LOT layer, i.e. the account can no longer size a trade
+    """
+    if not 0.0 < win_rate < 1.0:
+        raise ValueError("win_rate must be between 0 and 1")
+    if not 0.0 <= correlation <= 1.0:
+        raise ValueError("correlation must be between 0 and 1")
+    if layers is None:
+        layers = min(MAX_LAYERS, MAX_OPEN_TRADES)
+    if n_paths < 1:
+        raise ValueError("n_paths must be at least 1")
+    if days < 1:
+        raise ValueError("days must be at least 1")
+    if signals_per_day < 1:
+        raise ValueError("signals_per_day must be at least 1")
+    if layers < 1:
+        raise ValueError("layers must be at least 1")
+    if stop_loss_pips <= 0:
+        raise ValueError("stop_loss_pips must be positive")
+    pip_value = risk.pip_value_per_lot(symbol)
+    if ruin_balance is None:
+        ruin_balance = risk.MIN_LOT * stop_loss_pips * pip_value
+    check_sizing_parity(stop_loss_pips, symbol)
+
+    win_cdf = np.cumsum(layer_win_distribution(win_rate, correlation, layers))[:-1]
+    rng = np.random.default_rng(seed)
+    started = time.perf_counter()
+    results = []
+    for offset in range(0, n_paths, BATCH_SIZE):
+        results.append(_simulate_batch(
+            rng, min(BATCH_SIZE, n_paths - offset), start_balance, win_cdf, r_multiple, layers,
+            signals_per_day, days, stop_loss_pips, pip_value, cost_pips, ruin_balance,
+            target_balance, daily_loss_pct))
+    balance, max_dd, ruined, day_reached, stopped_days = (np.concatenate(parts) for parts in zip(*results))
+    elapsed = time.perf_counter() - started
+
+    reached = ~np.isnan(day_reached)
+    pct = [5, 25, 50, 75, 95]
+    return {
+        "paths": n_paths,
+        "days": days,
+        "layers": layers,
+        "ruin_balance": float(ruin_balance),
+        "target_balance": float(target_balance),
+        "ruin_probability": float(ruined.mean()),
+        "target_probability": float(reached.mean()),
+        "days_to_target": {p: float(v) for p, v in zip(pct, np.percentile(day_reached[reached], pct))}
+        if reached.any() else {},
+        "max_drawdown": {p: float(v) for p, v in zip(pct, np.percentile(max_dd, pct))},
+        "final_balance": {p: float(v) for p, v in zip(pct, np.percentile(balance, pct))},
+        "daily_stop_days_mean": float(stopped_days.mean()),
+        "elapsed_sec": elapsed,
+    }
+
+
+def _format_report(report):
+    def row(name, dist, fmt):
+        return "  %-16s" % name + "  ".join("p%d=%s" % (p, fmt % v) for p, v in dist.items())
+
+    lines = [
+        "paths=%d days=%d layers=%d (%.2fs)" % (report["paths"], report["days"], report["layers"],
+                                                report["elapsed_sec"]),
+        "  ruin (< %.2f):   %.2f%%" % (report["ruin_balance"], report["ruin_probability"] * 100),
+        "  reach %.2f:     %.2f%%" % (report["target_balance"], report["target_probability"] * 100),
+        row("days to target", report["days_to_target"], "%.0f"),
+        row("max drawdown", {p: v * 100 for p, v in report["max_drawdown"].items()}, "%.1f%%"),
+        row("final balance", report["final_balance"], "%.2f"),
+        "  daily stop hit:  %.2f days/path" % report["daily_stop_days_mean"],
+    ]
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Monte Carlo risk-of-ruin for the bot's sizing/layering rules")
+    parser.add_argument("--win-rate", type=float, required=True)
+    parser.add_argument("--r-multiple", type=float, default=1.5)
+    parser.add_argument("--correlation", type=float, default=0.5)
+    parser.add_argument("--balance", type=float, default=20.0)
+    parser.add_argument("--paths", type=int, default=100000)
+    parser.add_argument("--days", type=int, default=60)
+    parser.add_argument("--signals-per-day", type=int, default=10)
+    parser.add_argument("--sl-pips", type=float, default=10)
+    parser.add_argument("--symbol", default="EURUSD")
+    parser.add_argument("--layers", type=int, default=None)
+    parser.add_argument("--cost-pips", type=float, default=0.0)
+    parser.add_argument("--ruin-balance", type=float, default=None)
+    parser.add_argument("--target", type=float, default=MIN_BALANCE_FOR_GOLD)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    try:
+        report = simulate(args.win_rate, args.r_multiple, args.correlation, args.balance, args.paths,
+                          args.days, args.signals_per_day, args.sl_pips, args.symbol, args.layers,
+                          args.cost_pips, args.ruin_balance, args.target, seed=args.seed)
+    except ValueError as e:
+        parser.error(str(e))
+    print(_format_report(report))
+
+
+if __name__ == "__main__":
+    main()
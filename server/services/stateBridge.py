@@ -0,0 +1,298 @@
+# server/services/stateBridge.py
+import os
+import copy
+import json
+import time
+import sys
+import socket
+import logging
+import selectors
+import threading
+from dotenv import load_dotenv
+
+load_dotenv()
+LOG = logging.getLogger("stateBridge")
+LOG.setLevel(logging.INFO)
+
+# === ENV CONFIG ===
+STATE_BRIDGE_ENABLED = os.getenv("STATE_BRIDGE_ENABLED", "1") not in ("0", "false", "False", "")
+STATE_BRIDGE_PATH = os.getenv("STATE_BRIDGE_PATH", "/tmp/forexflipper-state.sock")   # unix socket path
+STATE_BRIDGE_PORT = int(os.getenv("STATE_BRIDGE_PORT", "5055"))                        # localhost TCP on Windows
+STATE_BRIDGE_COALESCE_BYTES = int(os.getenv("STATE_BRIDGE_COALESCE_BYTES", "65536"))  # backlog before deltas are coalesced
+STATE_BRIDGE_MAX_BUFFER = int(os.getenv("STATE_BRIDGE_MAX_BUFFER", "1048576"))        # backlog before a subscriber is dropped
+
+# Bump when the frame layout or the meaning of a top-level state key changes.
+SCHEMA_VERSION = 1
+
+# Frames are newline-delimited JSON objects:
+#   {"v": 1, "type": "snapshot", "seq": 7, "ts": 1700000000.0, "data": {...full state...}}
+#   {"v": 1, "type": "delta", "seq": 8, "base": 7, "ts": ..., "data": {...merge patch...}}
+# A delta is a JSON merge patch (RFC 7386) against the state at seq == base:
+# nested dicts are merged recursively and a null value deletes the key.
+
+
+def diff_state(old, new):
+    """
+    Return a merge patch turning `old` into `new` (None when nothing changed).
+    None-valued leaves in `new` are treated as absent, as in RFC 7386.
+    """
+    patch = {}
+    for key, value in new.items():
+        if value is None:
+            continue
+        prev = old.get(key)
+        if isinstance(value, dict) and isinstance(prev, dict):
+            sub = diff_state(prev, value)
+            if sub:
+                patch[key] = sub
+        elif prev != value:
+            patch[key] = value
+    for key in old:
+        if new.get(key) is None and old[key] is not None:
+            patch[key] = None
+    return patch or None
+
+
+def _encode(frame):
+    return (json.dumps(frame, separators=(",", ":"), default=float) + "\n").encode()
+
+
+class _Subscriber:
+    def __init__(self, sock):
+        self.sock = sock
+        self.outbox = bytearray()
+        self.needs_snapshot = True
+
+
+class StateBridge:
+    """
+    Publishes the bot's live state to local subscribers (the dashboard server).
+
+    publish() copies the state, swaps a reference and wakes the I/O thread, so it
+    never blocks the trading loop on I/O. Publishes that arrive faster than the
+    thread drains them are coalesced into one delta; subscribers that fall behind
+    are switched back to a fresh snapshot, and dropped if their backlog keeps growing.
+    """
+
+    def __init__(self, path=STATE_BRIDGE_PATH, port=STATE_BRIDGE_PORT):
+        self.path = path
+        self.port = port
+        self._lock = threading.Lock()
+        self._pending = None
+        self._state = {}
+        self._seq = 0
+        self._snapshot_frame = None
+        self._subscribers = {}
+        self._sel = None
+        self._server = None
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._wake_r.setblocking(False)
+        self._wake_w.setblocking(False)
+        self._thread = None
+        self._running = False
+
+    # --- trading-loop side ---
+    def publish(self, state):
+        """
+        Queue a full state dict for publication. Never blocks on I/O.
+        The state is deep-copied so callers can keep mutating their dicts in place.
+        """
+        state = copy.deepcopy(state)
+        with self._lock:
+            self._pending = state
+        try:
+            self._wake_w.send(b"\0")
+        except (BlockingIOError, OSError):
+            pass  # a wakeup is already queued
+
+    def start(self):
+        if self._running:
+            return self
+        self._server = self._listen()
+        self._sel = selectors.DefaultSelector()
+        self._sel.register(self._server, selectors.EVENT_READ, "accept")
+        self._sel.register(self._wake_r, selectors.EVENT_READ, "wake")
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="state-bridge", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if not self._running:
+            return
+        self._running = False
+        try:
+            self._wake_w.send(b"\0")
+        except OSError:
+            pass
+        self._thread.join(timeout=2.0)
+        for sub in list(self._subscribers.values()):
+            self._drop(sub)
+        self._sel.close()
+        self._server.close()
+        self._wake_r.close()
+        self._wake_w.close()
+        if sys.platform != "win32":
+            try:
+                os.unlink(self.path)
+            except OSError:
+                pass
+        LOG.info("State bridge stopped")
+
+    # --- I/O thread side ---
+    def _listen(self):
+        # same transport choice as stateBridge.ts (process.platform === "win32")
+        if sys.platform != "win32":
+            try:
+                os.unlink(self.path)
+            except OSError:
+                pass
+            server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            server.bind(self.path)
+            # owner only: the feed carries balance and positions; nobody can connect before listen()
+            os.chmod(self.path, 0o600)
+            LOG.info("State bridge listening on %s", self.path)
+        else:
+            server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            server.bind(("127.0.0.1", self.port))
+            LOG.info("State bridge listening on 127.0.0.1:%d", self.port)
+        server.listen(8)
+        server.setblocking(False)
+        return server
+
+    def _run(self):
+        while self._running:
+            try:
+                self._poll()
+            except Exception:
+                # keep the bridge alive; a dead thread would swallow every later publish
+                LOG.exception("State bridge I/O error")
+                time.sleep(0.1)
+
+    def _poll(self):
+        for key, mask in self._sel.select(timeout=1.0):
+            if key.data == "accept":
+                self._accept()
+            elif key.data == "wake":
+                try:
+                    while self._wake_r.recv(4096):
+                        pass
+                except (BlockingIOError, OSError):
+                    pass
+                self._broadcast()
+            else:
+                self._flush(key.data)
+
+    def _accept(self):
+        try:
+            sock, _ = self._server.accept()
+        except OSError:
+            return
+        sock.setblocking(False)
+        sub = _Subscriber(sock)
+        self._subscribers[sock.fileno()] = sub
+        self._sel.register(sock, selectors.EVENT_READ, sub)
+        LOG.info("State bridge subscriber connected (%d total)", len(self._subscribers))
+        self._queue_snapshot(sub)
+        self._flush(sub)
+
+    def _broadcast(self):
+        with self._lock:
+            state, self._pending = self._pending, None
+        if state is None:
+            return
+        patch = diff_state(self._state, state)
+        if patch is None:
+            return
+        base = self._seq
+        self._seq += 1
+        self._state = state
+        self._snapshot_frame = None
+        frame = None
+        for sub in list(self._subscribers.values()):
+            if sub.needs_snapshot or len(sub.outbox) > STATE_BRIDGE_COALESCE_BYTES:
+                # behind: skip deltas and resync with one snapshot once drained
+                sub.needs_snapshot = True
+                if not sub.outbox:
+                    self._queue_snapshot(sub)
+            else:
+                if frame is None:
+                    frame = _encode({"v": SCHEMA_VERSION, "type": "delta", "seq": self._seq,
+                                     "base": base, "ts": time.time(), "data": patch})
+                sub.outbox += frame
+            self._flush(sub)
+
+    def _queue_snapshot(self, sub):
+        if self._snapshot_frame is None:
+            self._snapshot_frame = _encode({"v": SCHEMA_VERSION, "type": "snapshot", "seq": self._seq,
+                                            "ts": time.time(), "data": self._state})
+        sub.outbox += self._snapshot_frame
+        sub.needs_snapshot = False
+
+    def _flush(self, sub):
+        if sub.sock.fileno() == -1:
+            return
+        try:
+            if sub.outbox:
+                sent = sub.sock.send(sub.outbox)
+                del sub.outbox[:sent]
+            else:
+                # readable with nothing queued: subscriber closed or sent data we ignore
+                if not sub.sock.recv(4096):
+                    self._drop(sub)
+                    return
+        except (BlockingIOError, InterruptedError):
+            pass
+        except OSError as e:
+            LOG.debug("State bridge subscriber error: %s", e)
+            self._drop(sub)
+            return
+
+        if len(sub.outbox) > STATE_BRIDGE_MAX_BUFFER:
+            LOG.warning("Dropping slow state bridge subscriber (%d bytes queued)", len(sub.outbox))
+            self._drop(sub)
+            return
+        if not sub.outbox and sub.needs_snapshot:
+            self._queue_snapshot(sub)
+            return self._flush(sub)
+        events = selectors.EVENT_READ | (selectors.EVENT_WRITE if sub.outbox else 0)
+        self._sel.modify(sub.sock, events, sub)
+
+    def _drop(self, sub):
+        self._subscribers.pop(sub.sock.fileno(), None)
+        try:
+            self._sel.unregister(sub.sock)
+        except (KeyError, ValueError):
+            pass
+        sub.sock.close()
+
+
+_bridge = None
+
+
+def start_bridge():
+    """Start the process-wide bridge (no-op if disabled). Returns it or None."""
+    global _bridge
+    if not STATE_BRIDGE_ENABLED:
+        return None
+    if _bridge is None:
+        try:
+            _bridge = StateBridge().start()
+        except OSError as e:
+            LOG.warning("State bridge failed to start: %s", e)
+            return None
+    return _bridge
+
+
+def publish(state):
+    """Publish a state snapshot if the bridge is running; otherwise do nothing."""
+    if _bridge is not None:
+        _bridge.publish(state)
+
+
+def stop_bridge():
+    global _bridge
+    if _bridge is not None:
+        _bridge.stop()
+        _bridge = None
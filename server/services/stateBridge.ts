@@ -0,0 +1,166 @@
+import net from "net";
+import { EventEmitter } from "events";
+
+// Must match SCHEMA_VERSION in server/services/stateBridge.py
+export const BOT_STATE_SCHEMA_VERSION = 1;
+
+export interface BotPosition {
+  symbol: string;
+  type: "buy" | "sell";
+  volume: number;
+  price_open: number;
+  sl: number;
+  tp: number;
+  profit: number;
+}
+
+export interface BotSymbolState {
+  ema9: number;
+  ema21: number;
+  rsi: number;
+  atr: number;
+  adx: number;
+  spread: number;
+  signal: "buy" | "sell" | "none";
+}
+
+export interface BotState {
+  status?: string;
+  balance?: number;
+  positions?: Record<string, BotPosition>;
+  symbols?: Record<string, BotSymbolState>;
+  daily?: { date: string | null; trade_count: number; daily_pnl: number };
+  timing?: { cycle: number; cycle_ms: number; manage_ms: number; scan_interval: number };
+}
+
+interface BridgeFrame {
+  v: number;
+  type: "snapshot" | "delta";
+  seq: number;
+  base?: number;
+  ts: number;
+  data: Record<string, any>;
+}
+
+// RFC 7386 merge patch: nested objects merge, null deletes
+function applyMergePatch(target: Record<string, any>, patch: Record<string, any>): Record<string, any> {
+  const result: Record<string, any> = { ...target };
+  for (const [key, value] of Object.entries(patch)) {
+    if (value === null) {
+      delete result[key];
+    } else if (typeof value === "object" && !Array.isArray(value) &&
+               typeof result[key] === "object" && result[key] !== null && !Array.isArray(result[key])) {
+      result[key] = applyMergePatch(result[key], value);
+    } else {
+      result[key] = value;
+    }
+  }
+  return result;
+}
+
+/**
+ * Subscribes to the live state published by the Python bot (main.py) over a
+ * local unix socket (or localhost TCP on Windows) and keeps the latest copy.
+ * Emits "update" with the merged state and the raw frame after each frame.
+ */
+export class BotStateBridge extends EventEmitter {
+  private socket: net.Socket | null = null;
+  private buffer = "";
+  private state: BotState = {};
+  private seq = -1;
+  private lastUpdate: number | null = null;
+  private reconnectTimer: NodeJS.Timeout | null = null;
+  private stopped = true;
+
+  constructor(
+    private path: string = process.env.STATE_BRIDGE_PATH || "/tmp/forexflipper-state.sock",
+    private port: number = parseInt(process.env.STATE_BRIDGE_PORT || "5055", 10),
+    private reconnectMs: number = 3000,
+  ) {
+    super();
+  }
+
+  start(): void {
+    this.stopped = false;
+    this.connect();
+  }
+
+  stop(): void {
+    this.stopped = true;
+    if (this.reconnectTimer) clearTimeout(this.reconnectTimer);
+    this.socket?.destroy();
+    this.socket = null;
+  }
+
+  getState() {
+    return {
+      connected: this.socket !== null && !this.socket.connecting,
+      seq: this.seq,
+      lastUpdate: this.lastUpdate,
+      state: this.state,
+    };
+  }
+
+  private connect(): void {
+    const socket = process.platform === "win32"
+      ? net.createConnection({ port: this.port, host: "127.0.0.1" })
+      : net.createConnection({ path: this.path });
+    this.socket = socket;
+    this.buffer = "";
+    this.seq = -1;
+
+    socket.setEncoding("utf8");
+    socket.on("connect", () => console.log("Bot state bridge connected"));
+    socket.on("data", (chunk: string) => this.onData(chunk));
+    socket.on("error", () => {
+      // bot not running yet; retried on close
+    });
+    socket.on("close", () => {
+      if (this.socket === socket) this.socket = null;
+      if (!this.stopped) {
+        this.reconnectTimer = setTimeout(() => this.connect(), this.reconnectMs);
+      }
+    });
+  }
+
+  private onData(chunk: string): void {
+    this.buffer += chunk;
+    let newline: number;
+    while ((newline = this.buffer.indexOf("\n")) !== -1) {
+      const line = this.buffer.slice(0, newline);
+      this.buffer = this.buffer.slice(newline + 1);
+      if (line) this.onFrame(line);
+    }
+  }
+
+  private onFrame(line: string): void {
+    let frame: BridgeFrame;
+    try {
+      frame = JSON.parse(line);
+    } catch (error) {
+      console.error("Invalid bot state frame:", error);
+      return;
+    }
+    if (frame.v !== BOT_STATE_SCHEMA_VERSION) {
+      console.error(`Unsupported bot state schema v${frame.v} (expected v${BOT_STATE_SCHEMA_VERSION})`);
+      this.socket?.destroy();
+      return;
+    }
+
+    if (frame.type === "snapshot") {
+      this.state = frame.data as BotState;
+    } else if (frame.base === this.seq) {
+      this.state = applyMergePatch(this.state, frame.data) as BotState;
+    } else {
+      // missed a delta; reconnect to get a fresh snapshot
+      console.warn(`Bot state gap (have ${this.seq}, delta base ${frame.base}); resyncing`);
+      this.socket?.destroy();
+      return;
+    }
+    this.seq = frame.seq;
+    this.lastUpdate = frame.ts;
+    this.emit("update", this.state, frame);
+  }
+}
+
+export const botStateBridge = new BotStateBridge();
@@ -0,0 +1,111 @@
+from collections import Counter, namedtuple
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from server.services import positionManager as pm
+
+POINT = 0.00001
+
+
+def _levels(is_buy, price_open, sl, tp, bid, ask, atr=0.0, stops_level=0):
+    arr = lambda v: np.array([v], dtype=float)
+    new_sl, changed = pm.compute_stop_levels(np.array([is_buy]), arr(price_open), arr(sl), arr(tp),
+                                             arr(bid), arr(ask), arr(atr), arr(POINT), arr(stops_level))
+    return float(new_sl[0]), bool(changed[0])
+
+
+def test_break_even_stop_does_not_shrink_unit_without_atr():
+    # SL already at break-even; 1R comes from TP (15 pips / 1.5 = 10 pips), not the 1-pip SL gap
+    new_sl, changed = _levels(True, 1.10000, 1.10010, 1.10150, bid=1.10100, ask=1.10101)
+    assert not changed
+    assert new_sl == pytest.approx(1.10010)
+
+
+def test_no_atr_and_no_tp_is_left_alone():
+    new_sl, changed = _levels(True, 1.10000, 1.09900, 0.0, bid=1.10500, ask=1.10501)
+    assert not changed
+    assert new_sl == pytest.approx(1.09900)
+
+
+@pytest.mark.parametrize("atr", [0.0010, 0.0])
+def test_buy_sell_symmetry(atr):
+    # +20 pips with a 10 pip unit: past TRAIL_START_ATR, trail sits TRAIL_DISTANCE_ATR behind price
+    buy_sl, buy_changed = _levels(True, 1.10000, 1.09900, 1.10150, bid=1.10200, ask=1.10201, atr=atr)
+    sell_sl, sell_changed = _levels(False, 1.10000, 1.10100, 1.09850, bid=1.09799, ask=1.09800, atr=atr)
+    assert buy_changed and sell_changed
+    expected = 1.10200 - pm.TRAIL_DISTANCE_ATR * 0.0010
+    assert buy_sl == pytest.approx(expected)
+    assert sell_sl == pytest.approx(2 * 1.10000 - expected)
+
+
+def test_stops_never_loosen():
+    # existing SL already tighter than the trail candidate
+    new_sl, changed = _levels(True, 1.10000, 1.10180, 1.10150, bid=1.10200, ask=1.10201, atr=0.0010)
+    assert not changed
+    assert new_sl == pytest.approx(1.10180)
+
+
+def test_candidate_inside_stops_level_is_clamped():
+    # trail wants 1.10200 (10 pips behind bid) but the broker needs 15 pips: stop lands on the boundary
+    new_sl, changed = _levels(True, 1.10000, 1.09900, 1.10150, bid=1.10300, ask=1.10301,
+                              atr=0.0010, stops_level=150)
+    assert changed
+    assert new_sl == pytest.approx(1.10150)
+
+    new_sl, changed = _levels(False, 1.10000, 1.10100, 1.09850, bid=1.09699, ask=1.09700,
+                              atr=0.0010, stops_level=150)
+    assert changed
+    assert new_sl == pytest.approx(1.09850)
+
+
+def test_manage_positions_batches_ipc(monkeypatch):
+    Position = namedtuple("Position", "ticket symbol type magic price_open sl tp")
+    Tick = namedtuple("Tick", "bid ask")
+    Info = namedtuple("Info", "point digits trade_stops_level")
+    calls = Counter()
+    ticks = {"EURUSD": Tick(1.10200, 1.10201), "GBPUSD": Tick(1.25000, 1.25001)}
+
+    def counted(name, fn):
+        def wrapper(*args):
+            calls[(name,) + args] += 1
+            return fn(*args)
+        return wrapper
+
+    positions = (
+        # 50 EURUSD buy layers in +20 pips profit: all trail
+        [Position(i, "EURUSD", 0, pm.BOT_MAGIC, 1.10000, 1.09900, 1.10150) for i in range(50)]
+        # same setup but opened manually / by another EA: untouched
+        + [Position(100, "EURUSD", 0, 999, 1.10000, 1.09900, 1.10150)]
+        # GBPUSD buy barely in profit: no change
+        + [Position(200, "GBPUSD", 0, pm.BOT_MAGIC, 1.24990, 1.24890, 1.25140)]
+    )
+    fake_mt5 = SimpleNamespace(
+        POSITION_TYPE_BUY=0,
+        positions_get=counted("positions_get", lambda: tuple(positions)),
+        symbol_info_tick=counted("symbol_info_tick", ticks.get),
+        symbol_info=counted("symbol_info", lambda symbol: Info(POINT, 5, 0)),
+    )
+    modified = []
+    monkeypatch.setattr(pm.broker, "mt5", fake_mt5)
+    monkeypatch.setattr(pm.broker, "modify_position_sltp",
+                        lambda ticket, symbol, sl, tp, digits, magic: modified.append((ticket, sl)) or {"ok": True})
+
+    result = pm.manage_positions({"EURUSD": 0.0010})
+
+    assert calls[("positions_get",)] == 1
+    for symbol in ("EURUSD", "GBPUSD"):
+        assert calls[("symbol_info_tick", symbol)] == 1
+        assert calls[("symbol_info", symbol)] == 1
+    assert sorted(result) == list(range(50))
+    assert sorted(t for t, _ in modified) == list(range(50))
+    assert all(sl == pytest.approx(1.10100) for _, sl in modified)
+
+
+def test_manage_positions_reuses_fetched_positions(monkeypatch):
+    def fail():
+        raise AssertionError("positions_get should not be called")
+
+    monkeypatch.setattr(pm.broker, "mt5", SimpleNamespace(positions_get=fail))
+    assert pm.manage_positions({}, positions=()) == []
@@ -0,0 +1,82 @@
+import math
+
+import numpy as np
+import pytest
+
+from server.services import riskManager as risk
+from server.services import riskSimulator as rs
+
+
+@pytest.mark.parametrize("win_rate,layers", [(0.5, 3), (0.42, 5), (0.7, 1)])
+def test_uncorrelated_layers_are_binomial(win_rate, layers):
+    expected = [math.comb(layers, k) * win_rate ** k * (1 - win_rate) ** (layers - k) for k in range(layers + 1)]
+    assert rs.layer_win_distribution(win_rate, 0.0, layers) == pytest.approx(expected, abs=1e-9)
+
+
+def test_fully_correlated_layers_win_or_lose_together():
+    probs = rs.layer_win_distribution(0.3, 1.0, 4)
+    assert probs == pytest.approx([0.7, 0.0, 0.0, 0.0, 0.3])
+
+
+def test_partial_correlation_keeps_mean_and_widens_tails():
+    probs = rs.layer_win_distribution(0.45, 0.6, 3)
+    assert probs.sum() == pytest.approx(1.0)
+    assert (np.arange(4) * probs).sum() == pytest.approx(3 * 0.45, abs=1e-6)
+    binomial = rs.layer_win_distribution(0.45, 0.0, 3)
+    assert probs[0] > binomial[0] and probs[3] > binomial[3]
+
+
+def test_lots_for_balance_matches_calculate_lot():
+    symbol, sl_pips = "EURUSD", 10
+    pip_value = risk.pip_value_per_lot(symbol)
+    threshold = risk.SMALL_ACCOUNT_THRESHOLD
+    balances = np.array([
+        0.5,                                  # MIN_LOT clamp
+        threshold * 0.5, threshold - 0.01,    # fixed-dollar risk
+        threshold, threshold * 3,             # percent risk
+        risk.MAX_LOT * sl_pips * pip_value / risk.DEFAULT_RISK_PCT * 10,  # MAX_LOT clamp
+    ])
+    vectorized = rs.lots_for_balance(balances, sl_pips, pip_value)
+    scalar = [risk.calculate_lot(float(b), sl_pips, symbol) for b in balances]
+    assert vectorized == pytest.approx(scalar)
+    assert vectorized[0] == risk.MIN_LOT
+    assert vectorized[-1] == risk.MAX_LOT
+
+
+def test_ruined_paths_stay_frozen():
+    # every signal loses all 3 layers at MIN_LOT: 20 -> 17 -> 14 (< 15, ruined) and then no more trades
+    report = rs.simulate(1e-9, correlation=1.0, start_balance=20.0, n_paths=200, days=5,
+                         signals_per_day=5, stop_loss_pips=10, layers=3, ruin_balance=15.0,
+                         daily_loss_pct=1.0, seed=1)
+    assert report["ruin_probability"] == 1.0
+    assert list(report["final_balance"].values()) == pytest.approx([14.0] * 5)
+
+
+def test_target_already_reached_counts_as_day_zero():
+    report = rs.simulate(0.5, start_balance=600.0, target_balance=500.0, n_paths=500, days=3, seed=1)
+    assert report["target_probability"] == 1.0
+    assert set(report["days_to_target"].values()) == {0.0}
+
+
+@pytest.mark.parametrize("kwargs,message", [
+    ({"win_rate": 0.0}, "win_rate"),
+    ({"correlation": 1.5}, "correlation"),
+    ({"n_paths": 0}, "n_paths"),
+    ({"days": -1}, "days"),
+    ({"signals_per_day": -2}, "signals_per_day"),
+    ({"layers": 0}, "layers"),
+    ({"stop_loss_pips": 0}, "stop_loss_pips"),
+    ({"stop_loss_pips": -5}, "stop_loss_pips"),
+])
+def test_simulate_rejects_invalid_arguments(kwargs, message):
+    args = {"win_rate": 0.5, "n_paths": 10, "days": 1, **kwargs}
+    with pytest.raises(ValueError, match=message):
+        rs.simulate(**args)
+
+
+def test_cli_reports_invalid_arguments(monkeypatch, capsys):
+    monkeypatch.setattr("sys.argv", ["riskSimulator", "--win-rate", "0.5", "--paths", "0"])
+    with pytest.raises(SystemExit) as exc:
+        rs.main()
+    assert exc.value.code == 2
+    assert "n_paths must be at least 1" in capsys.readouterr().err
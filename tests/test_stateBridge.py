@@ -0,0 +1,90 @@
+import json
+import os
+import socket
+import stat
+import sys
+import time
+
+import pytest
+
+from server.services import stateBridge as sb
+
+
+def _read_frames(sock, count, timeout=2.0):
+    sock.settimeout(timeout)
+    buf = b""
+    while buf.count(b"\n") < count:
+        buf += sock.recv(65536)
+    return [json.loads(line) for line in buf.split(b"\n")[:count]]
+
+
+def test_diff_state_merge_patch():
+    old = {"a": 1, "s": {"EURUSD": {"rsi": 50}, "GBPUSD": {"rsi": 40}}}
+    new = {"a": 1, "s": {"EURUSD": {"rsi": 51}}}
+    assert sb.diff_state(old, new) == {"s": {"EURUSD": {"rsi": 51}, "GBPUSD": None}}
+    assert sb.diff_state(new, new) is None
+
+
+def test_publish_in_place_mutated_state(tmp_path):
+    bridge = sb.StateBridge(path=str(tmp_path / "state.sock")).start()
+    try:
+        symbols = {"EURUSD": {"rsi": 40.0}}
+        bridge.publish({"symbols": symbols})
+        time.sleep(0.1)
+        client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        client.connect(bridge.path)
+        snapshot, = _read_frames(client, 1)
+        assert snapshot["data"] == {"symbols": {"EURUSD": {"rsi": 40.0}}}
+
+        # main.py mutates the same nested dict between cycles
+        symbols["EURUSD"]["rsi"] = 65.0
+        symbols["GBPUSD"] = {"rsi": 30.0}
+        bridge.publish({"symbols": symbols})
+        delta, = _read_frames(client, 1)
+        assert delta["type"] == "delta"
+        assert delta["base"] == snapshot["seq"]
+        assert delta["data"] == {"symbols": {"EURUSD": {"rsi": 65.0}, "GBPUSD": {"rsi": 30.0}}}
+        client.close()
+    finally:
+        bridge.stop()
+
+
+def test_io_thread_survives_errors(tmp_path, monkeypatch):
+    bridge = sb.StateBridge(path=str(tmp_path / "state.sock")).start()
+    try:
+        calls = []
+        real_diff = sb.diff_state
+
+        def flaky_diff(old, new):
+            calls.append(new)
+            if len(calls) == 1:
+                raise ValueError("boom")
+            return real_diff(old, new)
+
+        monkeypatch.setattr(sb, "diff_state", flaky_diff)
+        bridge.publish({"a": 1})
+        time.sleep(0.3)
+        bridge.publish({"a": 2})
+        time.sleep(0.3)
+        assert bridge._thread.is_alive()
+        assert bridge._state == {"a": 2}
+    finally:
+        bridge.stop()
+
+
+def test_stop_closes_all_sockets(tmp_path):
+    bridge = sb.StateBridge(path=str(tmp_path / "state.sock")).start()
+    bridge.stop()
+    assert bridge._server.fileno() == -1
+    assert bridge._wake_r.fileno() == -1
+    assert bridge._wake_w.fileno() == -1
+    bridge.publish({"a": 1})  # publishing after stop must not raise
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="unix socket transport only")
+def test_unix_socket_is_owner_only(tmp_path):
+    bridge = sb.StateBridge(path=str(tmp_path / "state.sock")).start()
+    try:
+        assert stat.S_IMODE(os.stat(bridge.path).st_mode) == 0o600
+    finally:
+        bridge.stop()